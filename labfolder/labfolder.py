@@ -1,10 +1,54 @@
+import asyncio
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
-from requests import (get as GET,
-                      post as POST, 
-                      delete as DELETE, 
-                      patch as PATCH)
+from itertools import islice
+from pathlib import Path
+from time import monotonic
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Union
+from typing import Iterator, Union
+
+# orjson parses the large JSON lists from the list endpoints several
+# times faster than the stdlib; fall back to json when not installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Brotli compresses the JSON list responses ~20% better than gzip, but
+# may only be advertised when a decoder is installed
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'br, gzip, deflate'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'br, gzip, deflate'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+def _parse_datetime(value: str) -> Union[datetime, None]:
+    """
+    Parse an ISO 8601 timestamp as returned by the API, e.g.
+    2023-04-06T10:30:00.000+02:00. Returns None for missing or
+    unparseable values.
+    """
+
+    if not value:
+        return None
+
+    # fromisoformat only accepts the Z suffix from Python 3.11 on
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
 
 class LabFolderApiException(Exception):
 
@@ -19,6 +63,9 @@ class User(object):
 
     """A class to represent a LabFolder user"""
 
+    __slots__ = ('group_membership_id', 'id', 'first_name', 'last_name',
+                 'email', '_headers', '_logged_in')
+
     def __init__(self, user_data: dict) -> None:
         self.group_membership_id = user_data.get('id', None) if user_data.get('user', None) else None
         user_data = user_data.get('user', user_data)
@@ -44,6 +91,9 @@ class Group(object):
         self.id = data['id']
         self.name = data['name']
         self.users = [User(u) for u in data['children']]
+        # Indexes for O(1) user lookup by ID or email
+        self._users_by_id = {u.id: u for u in self.users}
+        self._users_by_email = {u.email: u for u in self.users}
 
     def __str__(self) -> str:
         return self.name
@@ -59,10 +109,10 @@ class Group(object):
         """
 
         if id:
-            return next((u for u in self.users if u.id == str(id)), None)
+            return self._users_by_id.get(str(id), None)
 
         if username:
-            return next((u for u in self.users if u.email == username), None)
+            return self._users_by_email.get(username, None)
 
         return None
 
@@ -70,22 +120,72 @@ class BaseRecord(object):
 
     """
     A base class to define the attributes common to all
-    LabFolder objects other than User or Group
+    LabFolder objects other than User or Group.
+    Dates are parsed lazily: the raw strings are kept at
+    construction time and only converted to datetime when the
+    corresponding attribute is first accessed, so bulk listing
+    does not pay the parse cost for records that are never read.
     """
 
+    __slots__ = ('id', 'title', 'hidden',
+                 '_creation_raw', '_creation_date',
+                 '_version_raw', '_version_date')
+
+    # (attribute, JSON key, default) triples consumed by from_json_list;
+    # subclasses extend this with their own fields
+    _JSON_FIELDS = (('id', 'id', None),
+                    ('title', 'title', None),
+                    ('hidden', 'hidden', False),
+                    ('_creation_raw', 'creation_date', None),
+                    ('_version_raw', 'version_date', None))
+
     def __init__(self, data: dict) -> None:
-        datetime_format = '%Y-%m-%dT%H:%M:%S.%f%z'
         self.id = data.get('id', None)
         self.title = data.get('title', None)
         self.hidden = data.get('hidden', False)
-        try:
-            self.creation_date = datetime.strptime(data.get('creation_date', None), datetime_format)
-        except:
-            self.creation_date = None
-        try:
-            self.version_date = datetime.strptime(data.get('version_date', None), datetime_format)
-        except:
-            self.version_date = None
+        self._creation_raw = data.get('creation_date', None)
+        self._creation_date = None
+        self._version_raw = data.get('version_date', None)
+        self._version_date = None
+
+    @classmethod
+    def from_json_list(cls, data_list) -> list:
+        """
+        Build records in bulk from an iterable of API dicts.
+        Allocates each instance directly and assigns its fields in
+        one tight loop, skipping the per-record __init__ dispatch
+        through the class hierarchy. Used by the bulk fetch paths.
+        """
+
+        new = cls.__new__
+        fields = cls._JSON_FIELDS
+        records = []
+        append = records.append
+
+        for data in data_list:
+            record = new(cls)
+            get = data.get
+            for attr, key, default in fields:
+                setattr(record, attr, get(key, default))
+            record._creation_date = None
+            record._version_date = None
+            append(record)
+
+        return records
+
+    @property
+    def creation_date(self) -> Union[datetime, None]:
+        """Creation date, parsed on first access and memoized."""
+        if self._creation_date is None:
+            self._creation_date = _parse_datetime(self._creation_raw)
+        return self._creation_date
+
+    @property
+    def version_date(self) -> Union[datetime, None]:
+        """Version date, parsed on first access and memoized."""
+        if self._version_date is None:
+            self._version_date = _parse_datetime(self._version_raw)
+        return self._version_date
 
     def __str__(self) -> str:
         return f'{self.__class__.__name__} {self.id} - {self.title}'
@@ -97,6 +197,13 @@ class Folder(BaseRecord):
 
     """A class to represent a LabFolder folder"""
 
+    __slots__ = ('owner_id', 'group_id', 'parent_folder_id', 'folder_id')
+
+    _JSON_FIELDS = BaseRecord._JSON_FIELDS + (('owner_id', 'owner_id', None),
+                                              ('group_id', 'group_id', None),
+                                              ('parent_folder_id', 'parent_folder_id', None),
+                                              ('folder_id', 'folder_id', None))
+
     def __init__(self, data: dict) -> None:
         super(Folder, self).__init__(data=data)
         self.owner_id = data.get('owner_id', None)
@@ -108,6 +215,15 @@ class Entry(BaseRecord):
 
     """A class to represent a LabFolder entry"""
 
+    __slots__ = ('author_id', 'version_id', 'project_id', 'entry_number',
+                 'editable')
+
+    _JSON_FIELDS = BaseRecord._JSON_FIELDS + (('author_id', 'author_id', None),
+                                              ('version_id', 'version_id', None),
+                                              ('project_id', 'project_id', None),
+                                              ('entry_number', 'entry_number', None),
+                                              ('editable', 'editable', False))
+
     def __init__(self, data: dict) -> None:
         super(Entry, self).__init__(data=data)
         self.author_id = data.get('author_id', None)
@@ -120,34 +236,87 @@ class Project(BaseRecord):
 
     """A class to represent a LabFolder project"""
 
+    __slots__ = ('owner_id', 'group_id', 'folder_id')
+
+    _JSON_FIELDS = BaseRecord._JSON_FIELDS + (('owner_id', 'owner_id', None),
+                                              ('group_id', 'group_id', None),
+                                              ('folder_id', 'folder_id', None))
+
     def __init__(self, data: dict) -> None:
         super(Project, self).__init__(data=data)
         self.owner_id = data.get('owner_id', None)
         self.group_id = data.get('group_id', None)
         self.folder_id = data.get('folder_id', None)
 
+# API collection path for each record class, computed once instead of
+# re-deriving it from the class name on every call
+_REC_PATH = {Folder: 'folders',
+             Project: 'projects',
+             Entry: 'entries'}
+
 class LabFolder(object):
 
-    def __init__(self):
+    # Built once; the session merges in the default headers per request
+    _PATCH_HEADERS = {'Content-Type': 'application/json-patch+json'}
+
+    # Auth token persisted across runs, see use_cached_token
+    _TOKEN_PATH = Path('~/.cache/labfolder/token.json').expanduser()
+
+    # Project IDs sent per /entries request; each ID is repeated in
+    # the query string, so hundreds of projects would otherwise push
+    # the URL past common length limits
+    _IDS_PER_REQUEST = 50
+
+    def __init__(self, page_size: int = 50, use_cached_token: bool = False):
         self.me = None
         self.group = None
         self._api_base_url = 'https://labfolder.labforward.app/api/v2'
-        self._api_num_limit = 20
+        # Records fetched per request; the API caps limit at 50, its
+        # default of 20 costs more than twice the round-trips
+        self._api_num_limit = page_size
+        # Cap concurrent page fetches to respect per-host connection limits
+        self._max_workers = 8
+
+        # Short-lived cache of parsed responses for idempotent GETs,
+        # keyed on a hash of url and params
+        self._cache = dict()
+        self._cache_ttl = 60
+
+        # Reuse one HTTPS connection across calls instead of paying a
+        # new TCP + TLS handshake per request
+        self._session = Session()
+        self._session.headers['Accept-Encoding'] = _ACCEPT_ENCODING
+        retries = Retry(total=3,
+                        backoff_factor=0.3,
+                        status_forcelist=[429, 502, 503, 504])
+        self._session.mount('https://',
+                            HTTPAdapter(pool_connections=10,
+                                        pool_maxsize=20,
+                                        max_retries=retries))
+        # Create the connection pool for the API host up front; the
+        # socket it opens at login stays warm for all later calls
+        self._session.get_adapter(self._api_base_url) \
+                     .poolmanager.connection_from_url(self._api_base_url)
+
+        # Resume the previous session from the token saved on disk,
+        # skipping the interactive login while the token is valid;
+        # login only persists the token when this is set
+        self._use_cached_token = use_cached_token
+        if use_cached_token and self._load_token():
+            print(f'You are logged in as: {self.me}')
 
-    def _check_logged_in(self) -> bool:
+    def _check_logged_in(self) -> None:
         """
         Check if me is set, that is a user has
         been logged in.
         """
 
-        if not self.me:
+        if self.me is None:
             raise Exception('You are not logged in. '
                             'Please log in before performing this action.')
-        
-        return True
-    
+
     @staticmethod
-    def _check_group_membership(user: User) -> bool:
+    def _check_group_membership(user: User) -> None:
         """
         Check if user has group membership id.
         """
@@ -156,21 +325,59 @@ class LabFolder(object):
             raise Exception('You have not set a group. '
                             'Please set a group before running this function.')
 
+    def _save_token(self) -> None:
+        """
+        Persist the auth headers of me to disk, readable only by the
+        user. An unwritable cache directory must not fail the login
+        the token came from, so write errors are swallowed.
+        """
+
+        try:
+            self._TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self._TOKEN_PATH.touch(mode=0o600, exist_ok=True)
+            self._TOKEN_PATH.chmod(0o600)
+            self._TOKEN_PATH.write_text(json.dumps({'headers': self.me._headers}))
+        except OSError:
+            pass
+
+    def _load_token(self) -> bool:
+        """
+        Try to resume a previous session from the token saved on
+        disk, validating it with a single GET. Returns True when the
+        token is still valid.
+        """
+
+        if not self._TOKEN_PATH.is_file():
+            return False
+
+        try:
+            headers = json.loads(self._TOKEN_PATH.read_text())['headers']
+        except (ValueError, KeyError):
+            return False
+
+        self._session.headers.update(headers)
+
+        try:
+            me = self._get_logged_user()
+        except LabFolderApiException:
+            # Token expired or was revoked, fall back to login
+            for header in ('User-Agent', 'Authorization'):
+                self._session.headers.pop(header, None)
+            return False
+
+        me._headers = headers
+        me._logged_in = True
+        self.me = me
+
         return True
 
-    def _get_logged_user(self, headers: dict) -> User:
+    def _get_logged_user(self) -> User:
         """Get details of logged user."""
 
-        r = GET(f'{self._api_base_url}/me',
-                params={'expand': 'user'},
-                headers=headers)
+        user_data = self._cached_get(f'{self._api_base_url}/me',
+                                     params={'expand': 'user'})
 
-        if r.status_code == 200:
-            user_data = r.json()
-            user = User(user_data)
-            return user
-        else:
-            raise LabFolderApiException(error=r.json())
+        return User(user_data)
 
     def login(self, username: str) -> None:
         """
@@ -191,23 +398,27 @@ class LabFolder(object):
                        'password': password}
 
         # Send request
-        r = POST(f'{self._api_base_url}/auth/login',
-                 json=credentials)
+        r = self._session.post(f'{self._api_base_url}/auth/login',
+                               json=credentials)
 
         # Erase password
         password = None
 
         # Evaluate response
         if r.status_code == 200:
-            token = r.json()['token']
+            token = self._json(r)['token']
             headers = {'User-Agent': f'LabFolderApi; {username}',
                        'Authorization': f'Token {token}'}
-            self.me = self._get_logged_user(headers=headers)
+            self._session.headers.update(headers)
+            self._cache.clear()
+            self.me = self._get_logged_user()
             self.me._headers = headers
             self.me._logged_in = True
+            if self._use_cached_token:
+                self._save_token()
             print(f'You are logged in as: {self.me}')
         else:
-            raise LabFolderApiException(error=r.json())
+            raise LabFolderApiException(error=self._json(r))
 
     def logout(self) -> None:
         """Reset me and group. Invalidate token."""
@@ -216,16 +427,19 @@ class LabFolder(object):
         self._check_logged_in()
 
         # Send request
-        r = POST(f'{self._api_base_url}/auth/logout',
-                 headers=self.me._headers)
+        r = self._session.post(f'{self._api_base_url}/auth/logout')
 
         # Evaluate response
         if r.status_code == 204:
             self.me = None
             self.group = None
+            for header in ('User-Agent', 'Authorization'):
+                self._session.headers.pop(header, None)
+            self._cache.clear()
+            self._TOKEN_PATH.unlink(missing_ok=True)
             print('Logged out')
         else:
-            raise LabFolderApiException(error=r.json())
+            raise LabFolderApiException(error=self._json(r))
 
     def get_group(self, group_id: int) -> Group:
         """Given an ID, get the corresponding group"""
@@ -234,15 +448,9 @@ class LabFolder(object):
         self._check_logged_in()
 
         # Send request
-        r = GET(f'{self._api_base_url}/groups/{group_id}/tree',
-                headers=self.me._headers)
+        data = self._cached_get(f'{self._api_base_url}/groups/{group_id}/tree')
 
-        # Evaluate response
-        if r.status_code == 200:
-            data = r.json()
-            return Group(data)
-        else:
-            raise LabFolderApiException(error=r.json())
+        return Group(data)
 
     def set_group(self, group_id: str):
         """
@@ -260,6 +468,180 @@ class LabFolder(object):
         if me:
             self.me.group_membership_id = me.group_membership_id
 
+    @staticmethod
+    def _json(r) -> Union[list, dict]:
+        """
+        Parse a response body. Works on the raw bytes so the
+        response's encoding detection and str decode are skipped.
+        """
+
+        return _json_loads(r.content)
+
+    def _page_limits(self, limit: int) -> tuple:
+        """
+        Translate the number of records requested by the caller into
+        a per-page limit and an overall maximum. A limit of zero means
+        all records, signalled by a max_limit of zero.
+        """
+
+        max_limit = 0
+        if not limit:
+            limit = self._api_num_limit
+        elif limit > self._api_num_limit:
+            max_limit = limit
+            limit = self._api_num_limit
+        else:
+            max_limit = limit
+
+        return limit, max_limit
+
+    def _get_page(self, url: str, params: dict) -> list:
+        """Fetch a single page of results and return the parsed JSON."""
+
+        r = self._session.get(url, params=params)
+
+        if r.status_code == 200:
+            return self._json(r)
+        else:
+            raise LabFolderApiException(error=self._json(r))
+
+    def _cached_get(self, url: str, params: dict = None) -> Union[list, dict]:
+        """
+        GET through the short-lived response cache. A repeat of the
+        same request within the TTL returns the parsed JSON from the
+        cache without a round-trip. After the TTL, a conditional
+        request with If-None-Match revalidates the cached copy, so an
+        unchanged resource costs a bodyless 304 instead of a full
+        download and reparse.
+        Reserved for the small, frequently re-requested resources
+        (/me, the group tree, first list pages); everything cached
+        here stays pinned in memory until the next invalidation.
+        """
+
+        key = hashlib.blake2b(
+            repr((url, tuple(sorted((params or {}).items())))).encode()).hexdigest()
+
+        cached = self._cache.get(key)
+        etag = None
+        if cached:
+            timestamp, data, etag = cached
+            if monotonic() - timestamp < self._cache_ttl:
+                return data
+
+        # Send request, conditional if an ETag is known
+        r = self._session.get(url,
+                              params=params or {},
+                              headers={'If-None-Match': etag} if etag else None)
+
+        # Evaluate response
+        if r.status_code == 304:
+            data = cached[1]
+        elif r.status_code == 200:
+            data = self._json(r)
+        else:
+            raise LabFolderApiException(error=self._json(r))
+
+        self._cache[key] = (monotonic(), data, r.headers.get('ETag', etag))
+
+        return data
+
+    def _iter_pages(self, url: str, params: dict, limit: int = 0) -> Iterator[dict]:
+        """
+        Yield the raw records from url page by page, always in
+        full-size pages so the server and response cache see uniform
+        requests. The first page is always probed on its own, since
+        limit is only an upper bound and may far exceed what exists.
+        When a limit is given, the following pages are fetched
+        concurrently in waves of at most _max_workers, yielded in
+        offset order, and no further wave is scheduled once a short
+        page signals the end. Without a limit, pages are requested
+        one after the other, so callers can stop iterating without
+        fetching the rest.
+        """
+
+        page_limit = self._api_num_limit
+
+        # First page, also reveals whether more pages exist
+        first = self._cached_get(url, {**params,
+                                       'limit': page_limit,
+                                       'offset': 0})
+        yield from first
+
+        if len(first) < page_limit or page_limit >= limit > 0:
+            return
+
+        if limit:
+
+            # Fetch the remaining pages in waves; a wave at most
+            # overshoots the end of the records by _max_workers pages
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                wave_size = page_limit * self._max_workers
+                for wave_start in range(page_limit, limit, wave_size):
+                    offsets = range(wave_start,
+                                    min(limit, wave_start + wave_size),
+                                    page_limit)
+                    pages = executor.map(
+                        lambda offset: self._get_page(url, {**params,
+                                                            'limit': page_limit,
+                                                            'offset': offset}),
+                        offsets)
+                    for page in pages:
+                        yield from page
+                        if len(page) < page_limit:
+                            return
+
+            return
+
+        # Total unknown, probe page by page until a short page comes back
+        offset = page_limit
+        while True:
+            partial = self._get_page(url, {**params,
+                                           'limit': page_limit,
+                                           'offset': offset})
+            yield from partial
+            offset += page_limit
+            if len(partial) < page_limit:
+                break
+
+    def prefetch(self, group_id: str) -> tuple:
+        """
+        Concurrently fetch a group together with the projects and
+        folders of me, in one fan-out instead of three sequential
+        round-trips. Sets the group, exactly like set_group, and
+        returns (projects, folders).
+        """
+
+        # Checks
+        self._check_logged_in()
+
+        # One worker per independent request
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            group_future = executor.submit(self.get_group, group_id)
+            projects_future = executor.submit(self.get_projects)
+            folders_future = executor.submit(self.get_folders)
+            group_future.result()
+            projects = projects_future.result()
+            folders = folders_future.result()
+
+        # Served from the response cache warmed by the future above
+        self.set_group(group_id=group_id)
+
+        return projects, folders
+
+    def _iter_entry_pages(self, project_ids: list, limit: int = 0) -> Iterator[dict]:
+        """
+        Yield the raw entries for the given projects, batching the
+        project IDs so that no single request exceeds
+        _IDS_PER_REQUEST of them. The API offers no POST filter for
+        entries, so batched GETs keep the URL within length limits
+        for users with hundreds of projects.
+        """
+
+        url = f'{self._api_base_url}/entries'
+        for start in range(0, len(project_ids), self._IDS_PER_REQUEST):
+            batch = project_ids[start:start + self._IDS_PER_REQUEST]
+            yield from self._iter_pages(url, {'project_ids': batch}, limit)
+
     def get_entries_projects(self, user: User = None, limit: int = 0) -> list:
         """
         Get entries and projects for a user.
@@ -277,58 +659,135 @@ class LabFolder(object):
         if not user:
             user = self.me
 
-        # Set limits
-        max_limit = 0
-        if not limit:
-            limit = self._api_num_limit
-        elif limit > self._api_num_limit:
-            max_limit = limit
-            limit = self._api_num_limit
-        else:
-            max_limit = limit
-            limit = limit
-
         # Get projects
         projects = self.get_projects(user=user)
         project_ids = [p.id for p in projects]
 
-        # Get entries
-        entries = []
-        offset = 0
-        
-        while True:
-            
-            # Send request
-            r = GET(f'{self._api_base_url}/entries',
-                    params={'project_ids': project_ids,
-                            'limit': limit,
-                            'offset': offset},
-                    headers=self.me._headers)
+        # Get entries; islice stops at the requested count
+        entries = Entry.from_json_list(
+            islice(self._iter_entry_pages(project_ids, limit),
+                   limit or None))
+
+        return entries, projects
+
+    def _get_records(self, rec_obj: Union[Project, Folder], user: User = None, limit:  int = 0) -> list:
+        """
+        Get projects or folders for a user.
+        If no user is specified, me is used.
+        If no limit is specified, all records are returned.
+        """
+
+        # Checks
+        self._check_logged_in()
+
+        # Set user
+        if not user:
+            user = self.me
+
+        # Get records; islice stops at the requested count
+        return rec_obj.from_json_list(
+            islice(self._iter_pages(f'{self._api_base_url}/{_REC_PATH[rec_obj]}',
+                                    {'owner_id': user.id},
+                                    limit),
+                   limit or None))
+
+    async def get_records_async(self, rec_obj: Union[Project, Folder], user: User = None, limit: int = 0) -> list:
+        """
+        Get projects or folders for a user over aiohttp, fetching
+        pages concurrently on a single thread. Faster than the
+        threaded path when many pages are involved.
+        This is the coroutine to await from code that already runs an
+        event loop, e.g. a Jupyter notebook:
+        await lf.get_records_async(Project)
+        Requires the optional aiohttp package.
+        """
+
+        # Only needed for the async path
+        import aiohttp
 
-            # Evaluate response
-            if r.status_code == 200:
+        # Checks
+        self._check_logged_in()
+
+        # Set user
+        if not user:
+            user = self.me
+
+        # Set limits
+        limit, max_limit = self._page_limits(limit)
+
+        url = f'{self._api_base_url}/{_REC_PATH[rec_obj]}'
+        connector = aiohttp.TCPConnector(limit=32, limit_per_host=16)
+
+        async with aiohttp.ClientSession(connector=connector,
+                                         headers=dict(self._session.headers)) as session:
+
+            async def get_page(offset, page_limit):
+                async with session.get(url,
+                                       params={'owner_id': user.id,
+                                               'limit': page_limit,
+                                               'offset': offset}) as r:
+                    if r.status == 200:
+                        return await r.json()
+                    else:
+                        raise LabFolderApiException(error=await r.json())
 
-                partial = [Entry(d) for d in r.json()]
-                entries.extend(partial)
-                offset += limit
+            # First page, also reveals whether more pages exist
+            results = await get_page(0, limit)
 
-                if len(partial) < limit:
-                    break
+            if len(results) == limit and len(results) != max_limit:
 
                 if max_limit:
-                    if len(entries) == max_limit:
-                        break
-                    if len(entries) + limit > max_limit:
-                        limit = max_limit - len(entries)
+                    # Remaining offsets are known up front, fetch them at once
+                    offsets = range(limit, max_limit, limit)
+                    pages = await asyncio.gather(
+                        *(get_page(offset, min(limit, max_limit - offset))
+                          for offset in offsets))
+                    for page in pages:
+                        results.extend(page)
+                    results = results[:max_limit]
+
+                else:
+                    # Total unknown, probe until a short page comes back
+                    offset = limit
+                    while True:
+                        partial = await get_page(offset, limit)
+                        results.extend(partial)
+                        offset += limit
+                        if len(partial) < limit:
+                            break
+
+        return rec_obj.from_json_list(results)
+
+    def get_folders_async(self, user: User = None, limit: int = 0) -> list:
+        """
+        Get folders for a user via the aiohttp fast path.
+        Synchronous wrapper, same signature and result as get_folders.
+        Cannot be called while an event loop is already running, e.g.
+        in a Jupyter notebook; await get_records_async(Folder) there
+        instead.
+        """
 
-            else:
-                raise LabFolderApiException(error=r.json())
+        return asyncio.run(self.get_records_async(rec_obj=Folder, user=user, limit=limit))
 
-        return entries, projects
+    def get_projects_async(self, user: User = None, limit: int = 0) -> list:
+        """
+        Get projects for a user via the aiohttp fast path.
+        Synchronous wrapper, same signature and result as get_projects.
+        Cannot be called while an event loop is already running, e.g.
+        in a Jupyter notebook; await get_records_async(Project) there
+        instead.
+        """
 
-    def _get_records(self, rec_obj: Union[Project, Folder], user: User = None, limit:  int = 0) -> list:
+        return asyncio.run(self.get_records_async(rec_obj=Project, user=user, limit=limit))
+
+    def _iter_records(self, rec_obj: Union[Project, Folder], user: User = None, limit: int = 0) -> Iterator[Union[Project, Folder]]:
         """
-        Get projects or folders for a user.
+        Iterate over projects or folders for a user, yielding each
+        record as its page arrives rather than materializing the
+        full list first. The limit also lets the underlying pages be
+        fetched concurrently.
+        Not a generator function, so the checks run at call time,
+        like every other method; only the page fetches are deferred.
         If no user is specified, me is used.
         If no limit is specified, all records are returned.
         """
@@ -340,51 +799,52 @@ class LabFolder(object):
         if not user:
             user = self.me
 
-        # Set limits
-        max_limit = 0
-        if not limit:
-            limit = self._api_num_limit
-        elif limit > self._api_num_limit:
-            max_limit = limit
-            limit = self._api_num_limit
-        else:
-            max_limit = limit
-            limit = limit
+        return islice(
+            (rec_obj(d) for d in self._iter_pages(f'{self._api_base_url}/{_REC_PATH[rec_obj]}',
+                                                  {'owner_id': user.id},
+                                                  limit)),
+            limit or None)
 
-        # Get records
-        records = []
-        offset = 0
-        record_type = f'{rec_obj.__name__.lower()}s'
-        
-        while True:
-            
-            # Send request
-            r = GET(f'{self._api_base_url}/{record_type}',
-                    params={'owner_id': user.id,
-                            'limit': limit,
-                            'offset': offset},
-                    headers=self.me._headers)
+    def iter_folders(self, user: User = None, limit: int = 0) -> Iterator[Folder]:
+        """
+        Iterate over folders for a user.
+        If no user is specified, me is used.
+        If no limit is specified, all records are returned.
+        """
 
-            # Evaluate response
-            if r.status_code == 200:
+        return self._iter_records(rec_obj=Folder, user=user, limit=limit)
 
-                partial = [rec_obj(d) for d in r.json()]
-                records.extend(partial)
-                offset += limit
+    def iter_projects(self, user: User = None, limit: int = 0) -> Iterator[Project]:
+        """
+        Iterate over projects for a user.
+        If no user is specified, me is used.
+        If no limit is specified, all records are returned.
+        """
 
-                if len(partial) < limit:
-                    break
+        return self._iter_records(rec_obj=Project, user=user, limit=limit)
 
-                if max_limit:
-                    if len(records) == max_limit:
-                        break
-                    if len(records) + limit > max_limit:
-                        limit = max_limit - len(records)
+    def iter_entries(self, user: User = None, limit: int = 0) -> Iterator[Entry]:
+        """
+        Iterate over entries for a user, yielding each entry as its
+        page arrives. The user's projects are fetched first because
+        entries cannot be requested without specifying projects.
+        Not a generator function, so the checks and the projects
+        fetch run at call time; only the entry pages are deferred.
+        If no user is specified, me is used.
+        If no limit is specified, all records are returned.
+        """
 
-            else:
-                raise LabFolderApiException(error=r.json())
+        # Checks
+        self._check_logged_in()
 
-        return records
+        # Set user
+        if not user:
+            user = self.me
+
+        project_ids = [p.id for p in self.get_projects(user=user)]
+
+        return islice((Entry(d) for d in self._iter_entry_pages(project_ids, limit)),
+                      limit or None)
 
     def get_folders(self, user: User = None, limit: int = 0) -> list:
         """
@@ -404,33 +864,66 @@ class LabFolder(object):
 
         return self._get_records(rec_obj=Project, user=user, limit=limit)
 
-    def set_owner(self, record: Union[Folder, Project], new_owner: User) -> None:
-        """Set the owner of a record to a specific user."""
-
-        # Checks
-        self._check_logged_in()
-        self._check_group_membership(new_owner)
+    @staticmethod
+    def _check_owner_record_type(record: Union[Folder, Project]) -> None:
+        """Check that a record's owner can be set."""
 
-        # Check that record is of the right type
         rec_obj_name = record.__class__.__name__
         if rec_obj_name not in ['Folder', 'Project']:
             raise Exception(f'Setting the owner for "{rec_obj_name}" is not yet suported.')
 
+    def _patch_owner(self, record: Union[Folder, Project], new_owner: User) -> None:
+        """Send the owner PATCH for a single record, without checks."""
+
         # Data to be sent with patch
-        data = f'[{{"op":"replace", "path": "/owner_id", "value": "{new_owner.group_membership_id}"}}]'
-        patch_headers = {**self.me._headers, **{'Content-Type': 'application/json-patch+json'}}
-        record_type = f'{rec_obj_name.lower()}s'
+        patch = [{'op': 'replace',
+                  'path': '/owner_id',
+                  'value': str(new_owner.group_membership_id)}]
 
         # Send request
-        r = PATCH(f'{self._api_base_url}/{record_type}/{record.id}',
-                                data=data,
-                                headers=patch_headers)
-        
+        r = self._session.patch(f'{self._api_base_url}/{_REC_PATH[record.__class__]}/{record.id}',
+                                json=patch,
+                                headers=self._PATCH_HEADERS)
+
         # Evaluate response
-        if r.status_code == 200:
-            print(f'Set owner for "{record}" to {new_owner}')
-        else:
-            raise LabFolderApiException(error=r.json())
+        if r.status_code != 200:
+            raise LabFolderApiException(error=self._json(r))
+
+    def set_owner(self, record: Union[Folder, Project], new_owner: User) -> None:
+        """Set the owner of a record to a specific user."""
+
+        # Checks
+        self._check_logged_in()
+        self._check_group_membership(new_owner)
+        self._check_owner_record_type(record)
+
+        # Send request
+        self._patch_owner(record, new_owner)
+
+        self._cache.clear()
+        print(f'Set owner for "{record}" to {new_owner}')
+
+    def set_owner_bulk(self, records: list, new_owner: User) -> None:
+        """
+        Set the owner of many records to a specific user.
+        The LabFolder API offers no batch endpoint for this, so the
+        individual PATCH requests are dispatched concurrently over
+        the shared session rather than one round-trip at a time.
+        """
+
+        # Checks, once for the whole batch
+        self._check_logged_in()
+        self._check_group_membership(new_owner)
+        for record in records:
+            self._check_owner_record_type(record)
+
+        # Send requests
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            list(executor.map(lambda record: self._patch_owner(record, new_owner),
+                              records))
+
+        self._cache.clear()
+        print(f'Set owner for {len(records)} records to {new_owner}')
 
     def remove_user_from_group(self, user: User) -> None:
         """Remove a user from a group."""
@@ -440,14 +933,14 @@ class LabFolder(object):
         self._check_group_membership(user)
 
         # Send request
-        r = DELETE(f'{self._api_base_url}/group-memberships/{user.group_membership_id}',
-                              headers=self._headers)
+        r = self._session.delete(f'{self._api_base_url}/group-memberships/{user.group_membership_id}')
         
         # Evaluate response
         if r.status_code == 204:
+            self._cache.clear()
             print(f'{user} has been removed from {self.group}')
         else:
-            raise LabFolderApiException(error=r.json())
+            raise LabFolderApiException(error=self._json(r))
 
     def export_as_pdf(self, record: Union[Entry, Project]) -> None:
         """Export an entry or a project as PDF."""
@@ -470,13 +963,12 @@ class LabFolder(object):
         }
 
         # Send request
-        r = POST(f'{self._api_base_url}/exports/pdf',
-                            json=data,
-                            headers=self.me._headers)
+        r = self._session.post(f'{self._api_base_url}/exports/pdf',
+                               json=data)
         
         # Evaluate response
         if r.status_code == 202:
             print(f'Export successful for "{record}". '
                   'Check your account on the web to download the PDF.')
         else:
-            raise LabFolderApiException(error=r.json())
+            raise LabFolderApiException(error=self._json(r))